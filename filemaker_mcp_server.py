@@ -8,10 +8,16 @@ FileMaker data.
 """
 
 import asyncio
-import json
+import datetime
+import decimal
+import io
+import itertools
 import logging
 import os
+import uuid
+import orjson
 import pyodbc
+from collections import defaultdict
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
@@ -31,8 +37,8 @@ from mcp.types import (
     CallToolResult,
     ListResourcesResult,
     ListToolsResult,
-    ReadResourceResult,
 )
+from pydantic import AnyUrl
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,6 +49,57 @@ DEFAULT_DSN = os.environ.get("FILEMAKER_DSN", "FileMaker")
 DEFAULT_USER = os.environ.get("FILEMAKER_USER", "")
 DEFAULT_PASS = os.environ.get("FILEMAKER_PASS", "")
 
+# Upper bound on rows requested from the driver per fetchmany() call
+FETCH_BATCH_SIZE = 500
+
+# Converters for column types orjson can't handle natively, or renders
+# differently from str() (which is what the server has always returned),
+# keyed by the Python type pyodbc reports in cursor.description
+JSON_CONVERTERS = {
+    datetime.date: str,
+    datetime.datetime: str,
+    datetime.time: str,
+    decimal.Decimal: str,
+    bytearray: str,
+    uuid.UUID: str,
+}
+
+# Comparison operator and parameter pattern for search_patients match
+# modes. Only "prefix" and "exact" leave the leading characters fixed, which
+# lets FileMaker use a field index. "exact" compares with = so that % and _
+# in the search term are matched literally.
+SEARCH_PATTERNS = {
+    "prefix": ("LIKE", "{}%"),
+    "contains": ("LIKE", "%{}%"),
+    "exact": ("=", "{}"),
+}
+
+# Default columns for get_appointments / get_transactions. Both tables are
+# wide and include unstored calculation fields, so never SELECT *.
+APPOINTMENT_COLUMNS = (
+    "patient id#", "first name", "last name", "dateappt", "timeappt",
+    "doctor", "examtype", "confirmappt", "chartready",
+)
+TRANSACTION_COLUMNS = (
+    "Patient ID#", "Last Name", "First Name", "Transaction Date",
+    "Transaction #", "Exam Proc", "CL Fitting Proc", "Photos Proc",
+    "Office Proc", "Solutions",
+)
+
+# Maximum number of distinct INSERT/UPDATE statements memoized per server
+SQL_CACHE_SIZE = 256
+
+# Maximum number of open connections kept per database
+POOL_SIZE = int(os.environ.get("FILEMAKER_POOL_SIZE", "4"))
+
+# Indent JSON responses for human reading; compact output is smaller and
+# faster to produce, and is all the MCP client needs
+PRETTY_JSON = os.environ.get("MCP_PRETTY_JSON", "").lower() in ("1", "true", "yes")
+JSON_OPTIONS = orjson.OPT_INDENT_2 if PRETTY_JSON else 0
+
+# Skip opening connections to every database at startup (useful in development)
+LAZY_CONNECT = os.environ.get("FILEMAKER_LAZY_CONNECT", "").lower() in ("1", "true", "yes")
+
 
 @dataclass
 class FileMakerConfig:
@@ -59,6 +116,9 @@ class FileMakerConnection:
     def __init__(self, config: FileMakerConfig):
         self.config = config
         self._connection = None
+        self._cursor = None
+        # Worker thread future of the latest run() call
+        self._pending: asyncio.Future = None
 
     def connect(self, database: str = None) -> pyodbc.Connection:
         """Establish connection to FileMaker via ODBC."""
@@ -87,13 +147,49 @@ class FileMakerConnection:
 
     def close(self):
         """Close the database connection."""
+        if self._cursor:
+            self._cursor.close()
+            self._cursor = None
         if self._connection:
             self._connection.close()
             self._connection = None
             logger.info("FileMaker connection closed")
 
-    def execute_query(self, query: str, params: tuple = None, limit: int = 100) -> list[dict]:
-        """Execute a SQL query and return results as list of dicts.
+    def _get_cursor(self) -> pyodbc.Cursor:
+        """Get the connection's cursor, creating it on first use.
+
+        A single cursor is reused for every statement on this connection;
+        executing a new statement discards any unread rows from the last one.
+        """
+        if self._cursor is None:
+            self._cursor = self._connection.cursor()
+        return self._cursor
+
+    async def run(self, func, *args, **kwargs):
+        """Await one of this connection's blocking methods in a worker thread.
+
+        The thread is shielded from cancellation of the awaiting task: it
+        runs to completion, and ConnectionPool.acquire() keeps the connection
+        out of the pool until it has.
+        """
+        self._pending = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        return await asyncio.shield(self._pending)
+
+    def is_alive(self) -> bool:
+        """Check whether the ODBC connection is still usable."""
+        if not self._connection:
+            return False
+        try:
+            self._connection.getinfo(pyodbc.SQL_DATABASE_NAME)
+            return True
+        except pyodbc.Error:
+            return False
+
+    def execute_query(self, query: str, params: tuple = None, limit: int = 100) -> tuple[tuple[str, ...], list]:
+        """Execute a SQL query and return its column names and rows.
+
+        Values the JSON encoder can't handle (dates, decimals, ...) are
+        converted to strings in place, so rows can be serialized directly.
 
         Note: FileMaker ODBC doesn't support FETCH FIRST or LIMIT clauses,
         so we use cursor.fetchmany() to limit results instead.
@@ -101,79 +197,272 @@ class FileMakerConnection:
         if not self._connection:
             raise RuntimeError("Not connected to database")
 
-        cursor = self._connection.cursor()
-        try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-
-            # Get column names
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        cursor = self._get_cursor()
+        cursor.arraysize = max(1, min(limit, FETCH_BATCH_SIZE))
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+
+        # Get column names, and converters for columns that need them.
+        # Read from every result's description (not cached per SQL string),
+        # so they still match the rows after a FileMaker field changes.
+        description = cursor.description or ()
+        columns = tuple(desc[0] for desc in description)
+        converters = tuple(
+            (i, JSON_CONVERTERS[desc[1]])
+            for i, desc in enumerate(description)
+            if desc[1] in JSON_CONVERTERS
+        )
 
-            # Fetch limited results (FileMaker doesn't support SQL LIMIT clause)
-            rows = cursor.fetchmany(limit)
+        # Fetch limited results in batches (FileMaker doesn't support SQL LIMIT clause)
+        rows = []
+        while len(rows) < limit:
+            batch = cursor.fetchmany(min(cursor.arraysize, limit - len(rows)))
+            if not batch:
+                break
+            rows.extend(batch)
 
-            # Convert to list of dicts
-            results = []
-            for row in rows:
-                results.append(dict(zip(columns, row)))
+        for row in rows:
+            for i, convert in converters:
+                value = row[i]
+                if value is not None:
+                    row[i] = convert(value)
 
-            return results
-        finally:
-            cursor.close()
+        return columns, rows
 
     def execute_update(self, query: str, params: tuple = None) -> int:
         """Execute an INSERT/UPDATE/DELETE and return affected row count."""
         if not self._connection:
             raise RuntimeError("Not connected to database")
 
-        cursor = self._connection.cursor()
-        try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+        cursor = self._get_cursor()
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
 
+        self._connection.commit()
+        return cursor.rowcount
+
+    def execute_update_many(self, query: str, seq_of_params: list[tuple]) -> int:
+        """Execute an INSERT/UPDATE/DELETE once per parameter tuple in a single transaction.
+
+        Returns the affected row count, or the number of parameter tuples if
+        the driver doesn't report one for batched execution.
+        """
+        if not self._connection:
+            raise RuntimeError("Not connected to database")
+
+        cursor = self._get_cursor()
+        try:
+            cursor.fast_executemany = True
+            cursor.executemany(query, seq_of_params)
             self._connection.commit()
-            return cursor.rowcount
-        finally:
-            cursor.close()
+            return cursor.rowcount if cursor.rowcount >= 0 else len(seq_of_params)
+        except pyodbc.Error:
+            self._connection.rollback()
+            raise
 
     def get_tables(self) -> list[str]:
         """Get list of tables in the connected database."""
         if not self._connection:
             raise RuntimeError("Not connected to database")
 
-        cursor = self._connection.cursor()
-        try:
-            tables = []
-            for row in cursor.tables():
-                # Filter to just user tables
-                if row.table_type == "TABLE":
-                    tables.append(row.table_name)
-            return tables
-        finally:
-            cursor.close()
+        cursor = self._get_cursor()
+        tables = []
+        for row in cursor.tables():
+            # Filter to just user tables
+            if row.table_type == "TABLE":
+                tables.append(row.table_name)
+        return tables
 
     def get_columns(self, table_name: str) -> list[dict]:
         """Get column information for a table."""
         if not self._connection:
             raise RuntimeError("Not connected to database")
 
-        cursor = self._connection.cursor()
+        cursor = self._get_cursor()
+        return [_column_info(row) for row in cursor.columns(table=table_name)]
+
+    def get_schema(self) -> dict[str, list[dict]]:
+        """Get column information for every table in one catalog sweep.
+
+        Issues a single cursor.columns() call (no table filter) instead of
+        one round-trip per table, then groups the rows by table name.
+        """
+        if not self._connection:
+            raise RuntimeError("Not connected to database")
+
+        cursor = self._get_cursor()
+        tables = [row.table_name for row in cursor.tables() if row.table_type == "TABLE"]
+
+        columns_by_table = defaultdict(list)
+        for row in cursor.columns():
+            columns_by_table[row.table_name].append(_column_info(row))
+
+        return {table: columns_by_table.get(table, []) for table in tables}
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize obj to JSON text, indented only if MCP_PRETTY_JSON is set."""
+    return orjson.dumps(obj, default=str, option=JSON_OPTIONS).decode()
+
+
+def _rows_json(columns: tuple[str, ...], rows: list) -> str:
+    """Serialize query rows as a success payload.
+
+    Column names are written once and each row as an array of values, so
+    no per-row dict is built and keys aren't repeated in the output.
+    """
+    if PRETTY_JSON:
+        header = b'{\n  "success": true,\n  "row_count": %d,\n  "columns": %b,\n  "rows": ['
+        first_sep, sep, end = b"\n    ", b",\n    ", b"\n  ]\n}"
+    else:
+        header = b'{"success":true,"row_count":%d,"columns":%b,"rows":['
+        first_sep, sep, end = b"", b",", b"]}"
+
+    buf = io.BytesIO()
+    buf.write(header % (len(rows), orjson.dumps(columns)))
+    for i, row in enumerate(rows):
+        buf.write(sep if i else first_sep)
+        buf.write(orjson.dumps(tuple(row), default=str))
+    buf.write(end)
+    return buf.getvalue().decode()
+
+
+def _quote_identifier(name: str) -> str:
+    """Double-quote a FileMaker table or field name, unless already quoted."""
+    if len(name) >= 2 and name[0] == name[-1] == '"':
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _select_list(columns) -> str:
+    """Build a quoted SELECT column list."""
+    return ", ".join(map(_quote_identifier, columns))
+
+
+def _column_info(row) -> dict:
+    """Convert an ODBC catalog row from cursor.columns() to a column dict."""
+    return {
+        "name": row.column_name,
+        "type": row.type_name,
+        "size": row.column_size,
+        "nullable": row.nullable == 1
+    }
+
+
+# get_transactions filters, in parameter order: patient, start date, end date
+TRANSACTION_FILTERS = ('"Patient ID#" = ?', '"Transaction Date" >= ?', '"Transaction Date" <= ?')
+
+# WHERE clause for each combination of filters present, and the full
+# statement for the default column list, keyed by (patient, start, end)
+TRANSACTION_WHERE = {
+    flags: (" WHERE " + " AND ".join(itertools.compress(TRANSACTION_FILTERS, flags))) if any(flags) else ""
+    for flags in itertools.product((False, True), repeat=3)
+}
+TRANSACTION_SQL = {
+    flags: f"SELECT {_select_list(TRANSACTION_COLUMNS)} FROM Transactions{where}"
+    for flags, where in TRANSACTION_WHERE.items()
+}
+
+
+class ConnectionPool:
+    """Bounded pool of open FileMaker connections for a single database.
+
+    Connections are opened lazily up to the pool size and checked for
+    liveness when handed out; dead ones are closed and replaced. A borrower
+    cancelled mid-call doesn't free its connection (or its slot) until the
+    worker thread using it has finished.
+    """
+
+    def __init__(self, config: FileMakerConfig, database: str, size: int = POOL_SIZE):
+        self.config = config
+        self.database = database
+        self.size = size
+        self._idle: asyncio.Queue[FileMakerConnection] = asyncio.Queue()
+        # One permit per connection that may be open, held by each borrower
+        # until its connection is back in _idle. A failed open gives its
+        # permit back too, so waiters never outlive the capacity they wait on.
+        self._slots = asyncio.Semaphore(size)
+        self._opened = 0
+
+    def _connect(self) -> FileMakerConnection:
+        conn = FileMakerConnection(self.config)
+        conn.connect(self.database)
+        return conn
+
+    def _release(self, conn: FileMakerConnection = None):
+        """Put conn (if any) back in the idle queue and free its slot."""
+        if conn is not None:
+            self._idle.put_nowait(conn)
+        self._slots.release()
+
+    def _release_after(self, task: asyncio.Future, conn: FileMakerConnection = None):
+        """Release the slot once task's worker thread has finished.
+
+        conn is the connection the worker was using; if None, the task was
+        opening one, and the connection it produced (if any) is kept.
+        """
+        def done(task: asyncio.Future):
+            opened = conn
+            if not task.cancelled() and task.exception() is None and opened is None:
+                opened = task.result()
+                self._opened += 1
+            self._release(opened)
+
+        task.add_done_callback(done)
+
+    async def _get(self) -> FileMakerConnection:
+        """Wait for a free slot, then hand out an idle connection or open one."""
+        await self._slots.acquire()
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            try:
+                alive = await conn.run(conn.is_alive)
+            except BaseException:
+                self._release_after(conn._pending, conn)
+                raise
+            if alive:
+                return conn
+
+            logger.warning(f"Replacing dead connection to {self.database}")
+            conn.close()
+            self._opened -= 1
+
+        task = asyncio.ensure_future(asyncio.to_thread(self._connect))
         try:
-            columns = []
-            for row in cursor.columns(table=table_name):
-                columns.append({
-                    "name": row.column_name,
-                    "type": row.type_name,
-                    "size": row.column_size,
-                    "nullable": row.nullable == 1
-                })
-            return columns
+            conn = await asyncio.shield(task)
+        except BaseException:
+            self._release_after(task)
+            raise
+        self._opened += 1
+        return conn
+
+    async def warm(self):
+        """Open one connection ahead of time so the first request skips the handshake."""
+        if self._opened == 0:
+            async with self.acquire():
+                pass
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a connection, returning it to the pool when done."""
+        conn = await self._get()
+        try:
+            yield conn
         finally:
-            cursor.close()
+            if conn._pending is not None and not conn._pending.done():
+                self._release_after(conn._pending, conn)
+            else:
+                self._release(conn)
+
+    def close(self):
+        """Close all idle connections in the pool."""
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+            self._opened -= 1
 
 
 # Available FileMaker databases (based on .fp7 files)
@@ -191,272 +480,369 @@ FILEMAKER_DATABASES = [
     "Timecards",
     "Transactions"
 ]
+DATABASE_SET = frozenset(FILEMAKER_DATABASES)
+
+# Description of the "database" argument shared by the tool schemas
+DATABASE_ARG_DESCRIPTION = f"Database name. Available: {', '.join(FILEMAKER_DATABASES)}"
 
+# Resource URIs are filemaker://<database>
+URI_PREFIX = "filemaker://"
+URI_PREFIX_LEN = len(URI_PREFIX)
 
-def create_server(config: FileMakerConfig = None) -> Server:
+
+async def warm_pools(pools: dict[str, ConnectionPool]):
+    """Open a connection to every database concurrently."""
+    results = await asyncio.gather(
+        *(pool.warm() for pool in pools.values()),
+        return_exceptions=True
+    )
+    for database, result in zip(pools, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Could not pre-connect to {database}: {result}")
+
+
+def create_server(config: FileMakerConfig = None, pools: dict[str, ConnectionPool] = None) -> Server:
     """Create and configure the MCP server."""
 
     server = Server("filemaker-mcp-server")
     fm_config = config or FileMakerConfig()
-    connections: dict[str, FileMakerConnection] = {}
-
-    def get_connection(database: str) -> FileMakerConnection:
-        """Get or create a connection for a database."""
-        if database not in connections:
-            conn = FileMakerConnection(fm_config)
-            conn.connect(database)
-            connections[database] = conn
-        return connections[database]
+    pools = pools if pools is not None else {}
+    # Schema introspection results per database, and the serialized
+    # resource text built from them. Filled on first read, cleared only by
+    # the refresh_schema tool.
+    schema_cache: dict[str, dict] = {}
+    schema_text_cache: dict[str, str] = {}
+    # Parameterized INSERT/UPDATE statements per (kind, database, table,
+    # columns), up to SQL_CACHE_SIZE of them. Unknown columns are left for
+    # FileMaker to reject, so entries don't depend on the schema cache.
+    sql_cache: dict[tuple, str] = {}
+
+    def get_pool(database: str) -> ConnectionPool:
+        """Get or create the connection pool for a database."""
+        if database not in pools:
+            pools[database] = ConnectionPool(fm_config, database)
+        return pools[database]
+
+    def insert_sql(database: str, table: str, columns: tuple[str, ...]) -> str:
+        """Get the parameterized INSERT statement for a table and column set."""
+        key = ("insert", database, table, columns)
+        sql = sql_cache.get(key)
+        if sql is None:
+            column_list = ", ".join(map(_quote_identifier, columns))
+            placeholders = ", ".join("?" * len(columns))
+            sql = f"INSERT INTO {_quote_identifier(table)} ({column_list}) VALUES ({placeholders})"
+            if len(sql_cache) < SQL_CACHE_SIZE:
+                sql_cache[key] = sql
+        return sql
+
+    def update_sql(database: str, table: str, columns: tuple[str, ...]) -> str:
+        """Get the parameterized UPDATE statement, up to the WHERE keyword."""
+        key = ("update", database, table, columns)
+        sql = sql_cache.get(key)
+        if sql is None:
+            set_clause = ", ".join(f"{_quote_identifier(c)} = ?" for c in columns)
+            sql = f"UPDATE {_quote_identifier(table)} SET {set_clause} WHERE "
+            if len(sql_cache) < SQL_CACHE_SIZE:
+                sql_cache[key] = sql
+        return sql
+
+    # The tool and resource catalogs never change, so build them once
+    tools_result = ListToolsResult(tools=[
+        Tool(
+            name="query",
+            description="Execute a SELECT query on a FileMaker database. Use standard SQL syntax. Results are returned as a list of column names and rows of values in the same order.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database": {
+                        "type": "string",
+                        "description": DATABASE_ARG_DESCRIPTION
+                    },
+                    "sql": {
+                        "type": "string",
+                        "description": "SQL SELECT query to execute"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of rows to return (default: 100)",
+                        "default": 100
+                    }
+                },
+                "required": ["database", "sql"]
+            }
+        ),
+        Tool(
+            name="list_tables",
+            description="List all tables in a FileMaker database",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database": {
+                        "type": "string",
+                        "description": DATABASE_ARG_DESCRIPTION
+                    }
+                },
+                "required": ["database"]
+            }
+        ),
+        Tool(
+            name="describe_table",
+            description="Get column information for a table in a FileMaker database",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database": {
+                        "type": "string",
+                        "description": DATABASE_ARG_DESCRIPTION
+                    },
+                    "table": {
+                        "type": "string",
+                        "description": "Table name to describe"
+                    }
+                },
+                "required": ["database", "table"]
+            }
+        ),
+        Tool(
+            name="insert_record",
+            description="Insert a new record into a FileMaker table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database": {
+                        "type": "string",
+                        "description": DATABASE_ARG_DESCRIPTION
+                    },
+                    "table": {
+                        "type": "string",
+                        "description": "Table name"
+                    },
+                    "data": {
+                        "type": "object",
+                        "description": "Key-value pairs of column names and values to insert"
+                    }
+                },
+                "required": ["database", "table", "data"]
+            }
+        ),
+        Tool(
+            name="insert_records",
+            description="Insert multiple records into a FileMaker table in one transaction. All records must have the same columns.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database": {
+                        "type": "string",
+                        "description": DATABASE_ARG_DESCRIPTION
+                    },
+                    "table": {
+                        "type": "string",
+                        "description": "Table name"
+                    },
+                    "data": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "List of records, each a set of key-value pairs of column names and values to insert"
+                    }
+                },
+                "required": ["database", "table", "data"]
+            }
+        ),
+        Tool(
+            name="update_record",
+            description="Update records in a FileMaker table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database": {
+                        "type": "string",
+                        "description": DATABASE_ARG_DESCRIPTION
+                    },
+                    "table": {
+                        "type": "string",
+                        "description": "Table name"
+                    },
+                    "data": {
+                        "type": "object",
+                        "description": "Key-value pairs of column names and values to update"
+                    },
+                    "where": {
+                        "type": "string",
+                        "description": "WHERE clause condition (without 'WHERE' keyword)"
+                    }
+                },
+                "required": ["database", "table", "data", "where"]
+            }
+        ),
+        Tool(
+            name="list_all_databases",
+            description="List all available FileMaker databases and their tables",
+            inputSchema={
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        ),
+        Tool(
+            name="refresh_schema",
+            description="Discard cached schema information so it is re-read from FileMaker on next access",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database": {
+                        "type": "string",
+                        "description": "Database to refresh (optional, refreshes all if omitted)"
+                    }
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="search_patients",
+            description="Search for patients by name, ID, or other criteria",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "search_term": {
+                        "type": "string",
+                        "description": "Search term (name, patient ID, phone, etc.)"
+                    },
+                    "field": {
+                        "type": "string",
+                        "description": "Field to search in. Use quotes for fields with spaces: '\"Last Name\"', '\"First Name\"', '\"patient id#\"'",
+                        "default": "\"Last Name\""
+                    },
+                    "match_mode": {
+                        "type": "string",
+                        "enum": list(SEARCH_PATTERNS),
+                        "description": "How to match the search term: 'prefix' (starts with, can use an index - strongly preferred), 'contains' (full table scan, slow), or 'exact'",
+                        "default": "prefix"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum results to return",
+                        "default": 50
+                    }
+                },
+                "required": ["search_term"]
+            }
+        ),
+        Tool(
+            name="get_appointments",
+            description="Get appointments for a specific date or date range",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "date": {
+                        "type": "string",
+                        "description": "Date in YYYY-MM-DD format"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "End date for range query (optional)"
+                    },
+                    "patient_id": {
+                        "type": "string",
+                        "description": "Filter by patient ID (optional)"
+                    },
+                    "columns": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": f"Columns to return (optional). Default: {', '.join(APPOINTMENT_COLUMNS)}"
+                    }
+                },
+                "required": ["date"]
+            }
+        ),
+        Tool(
+            name="get_transactions",
+            description="Get transactions for a patient or date range",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "patient_id": {
+                        "type": "string",
+                        "description": "Patient ID to look up transactions for"
+                    },
+                    "start_date": {
+                        "type": "string",
+                        "description": "Start date in YYYY-MM-DD format (optional)"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "End date in YYYY-MM-DD format (optional)"
+                    },
+                    "columns": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": f"Columns to return (optional). Default: {', '.join(TRANSACTION_COLUMNS)}"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum results",
+                        "default": 100
+                    }
+                },
+                "required": []
+            }
+        )
+    ])
+
+    resources_result = ListResourcesResult(resources=[
+        Resource(
+            uri=f"{URI_PREFIX}{db}",
+            name=f"FileMaker: {db}",
+            description=f"FileMaker database: {db}.fp7",
+            mimeType="application/json"
+        )
+        for db in FILEMAKER_DATABASES
+    ])
 
     @server.list_resources()
     async def list_resources() -> ListResourcesResult:
         """List available FileMaker databases as resources."""
-        resources = []
-        for db in FILEMAKER_DATABASES:
-            resources.append(
-                Resource(
-                    uri=f"filemaker://{db}",
-                    name=f"FileMaker: {db}",
-                    description=f"FileMaker database: {db}.fp7",
-                    mimeType="application/json"
-                )
-            )
-        return ListResourcesResult(resources=resources)
+        return resources_result
 
     @server.read_resource()
-    async def read_resource(uri: str) -> ReadResourceResult:
+    async def read_resource(uri: AnyUrl) -> str:
         """Read schema information for a FileMaker database."""
-        # Parse the URI to get database name
-        if not uri.startswith("filemaker://"):
+        # The SDK passes a pydantic URL; parse its string form for the database name
+        uri = str(uri)
+        if uri[:URI_PREFIX_LEN] != URI_PREFIX:
             raise ValueError(f"Invalid URI scheme: {uri}")
 
-        database = uri.replace("filemaker://", "")
+        database = uri[URI_PREFIX_LEN:].rstrip("/")
+        if database not in DATABASE_SET:
+            raise ValueError(f"Unknown database: {database}")
 
         try:
-            conn = get_connection(database)
-            tables = conn.get_tables()
-
-            schema_info = {
-                "database": database,
-                "tables": []
-            }
-
-            for table in tables:
-                columns = conn.get_columns(table)
-                schema_info["tables"].append({
-                    "name": table,
-                    "columns": columns
-                })
+            text = schema_text_cache.get(database)
+            if text is None:
+                schema = schema_cache.get(database)
+                if schema is None:
+                    async with get_pool(database).acquire() as conn:
+                        schema = await conn.run(conn.get_schema)
+                    schema_cache[database] = schema
+
+                schema_info = {
+                    "database": database,
+                    "tables": [
+                        {"name": table, "columns": columns}
+                        for table, columns in schema.items()
+                    ]
+                }
+                text = _dumps(schema_info)
+                schema_text_cache[database] = text
 
-            return ReadResourceResult(
-                contents=[
-                    TextContent(
-                        type="text",
-                        text=json.dumps(schema_info, indent=2, default=str)
-                    )
-                ]
-            )
+            return text
         except Exception as e:
             logger.error(f"Error reading resource {uri}: {e}")
-            return ReadResourceResult(
-                contents=[
-                    TextContent(
-                        type="text",
-                        text=json.dumps({"error": str(e)})
-                    )
-                ]
-            )
+            return _dumps({"error": str(e)})
 
     @server.list_tools()
     async def list_tools() -> ListToolsResult:
         """List available tools for interacting with FileMaker."""
-        return ListToolsResult(tools=[
-            Tool(
-                name="query",
-                description="Execute a SELECT query on a FileMaker database. Use standard SQL syntax.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "database": {
-                            "type": "string",
-                            "description": f"Database name. Available: {', '.join(FILEMAKER_DATABASES)}"
-                        },
-                        "sql": {
-                            "type": "string",
-                            "description": "SQL SELECT query to execute"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of rows to return (default: 100)",
-                            "default": 100
-                        }
-                    },
-                    "required": ["database", "sql"]
-                }
-            ),
-            Tool(
-                name="list_tables",
-                description="List all tables in a FileMaker database",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "database": {
-                            "type": "string",
-                            "description": f"Database name. Available: {', '.join(FILEMAKER_DATABASES)}"
-                        }
-                    },
-                    "required": ["database"]
-                }
-            ),
-            Tool(
-                name="describe_table",
-                description="Get column information for a table in a FileMaker database",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "database": {
-                            "type": "string",
-                            "description": f"Database name. Available: {', '.join(FILEMAKER_DATABASES)}"
-                        },
-                        "table": {
-                            "type": "string",
-                            "description": "Table name to describe"
-                        }
-                    },
-                    "required": ["database", "table"]
-                }
-            ),
-            Tool(
-                name="insert_record",
-                description="Insert a new record into a FileMaker table",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "database": {
-                            "type": "string",
-                            "description": f"Database name. Available: {', '.join(FILEMAKER_DATABASES)}"
-                        },
-                        "table": {
-                            "type": "string",
-                            "description": "Table name"
-                        },
-                        "data": {
-                            "type": "object",
-                            "description": "Key-value pairs of column names and values to insert"
-                        }
-                    },
-                    "required": ["database", "table", "data"]
-                }
-            ),
-            Tool(
-                name="update_record",
-                description="Update records in a FileMaker table",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "database": {
-                            "type": "string",
-                            "description": f"Database name. Available: {', '.join(FILEMAKER_DATABASES)}"
-                        },
-                        "table": {
-                            "type": "string",
-                            "description": "Table name"
-                        },
-                        "data": {
-                            "type": "object",
-                            "description": "Key-value pairs of column names and values to update"
-                        },
-                        "where": {
-                            "type": "string",
-                            "description": "WHERE clause condition (without 'WHERE' keyword)"
-                        }
-                    },
-                    "required": ["database", "table", "data", "where"]
-                }
-            ),
-            Tool(
-                name="list_all_databases",
-                description="List all available FileMaker databases and their tables",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            ),
-            Tool(
-                name="search_patients",
-                description="Search for patients by name, ID, or other criteria",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "search_term": {
-                            "type": "string",
-                            "description": "Search term (name, patient ID, phone, etc.)"
-                        },
-                        "field": {
-                            "type": "string",
-                            "description": "Field to search in. Use quotes for fields with spaces: '\"Last Name\"', '\"First Name\"', '\"patient id#\"'",
-                            "default": "\"Last Name\""
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum results to return",
-                            "default": 50
-                        }
-                    },
-                    "required": ["search_term"]
-                }
-            ),
-            Tool(
-                name="get_appointments",
-                description="Get appointments for a specific date or date range",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "date": {
-                            "type": "string",
-                            "description": "Date in YYYY-MM-DD format"
-                        },
-                        "end_date": {
-                            "type": "string",
-                            "description": "End date for range query (optional)"
-                        },
-                        "patient_id": {
-                            "type": "string",
-                            "description": "Filter by patient ID (optional)"
-                        }
-                    },
-                    "required": ["date"]
-                }
-            ),
-            Tool(
-                name="get_transactions",
-                description="Get transactions for a patient or date range",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "patient_id": {
-                            "type": "string",
-                            "description": "Patient ID to look up transactions for"
-                        },
-                        "start_date": {
-                            "type": "string",
-                            "description": "Start date in YYYY-MM-DD format (optional)"
-                        },
-                        "end_date": {
-                            "type": "string",
-                            "description": "End date in YYYY-MM-DD format (optional)"
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum results",
-                            "default": 100
-                        }
-                    },
-                    "required": []
-                }
-            )
-        ])
+        return tools_result
 
     @server.call_tool()
     async def call_tool(name: str, arguments: dict) -> CallToolResult:
@@ -469,36 +855,32 @@ def create_server(config: FileMakerConfig = None) -> Server:
 
                 # FileMaker ODBC doesn't support FETCH FIRST or LIMIT
                 # We pass limit to execute_query which uses fetchmany()
-                conn = get_connection(database)
-                results = conn.execute_query(sql, limit=limit)
+                async with get_pool(database).acquire() as conn:
+                    columns, rows = await conn.run(conn.execute_query, sql, limit=limit)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
-                                "success": True,
-                                "row_count": len(results),
-                                "data": results
-                            }, indent=2, default=str)
+                            text=_rows_json(columns, rows)
                         )
                     ]
                 )
 
             elif name == "list_tables":
                 database = arguments["database"]
-                conn = get_connection(database)
-                tables = conn.get_tables()
+                async with get_pool(database).acquire() as conn:
+                    tables = await conn.run(conn.get_tables)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
+                            text=_dumps({
                                 "success": True,
                                 "database": database,
                                 "tables": tables
-                            }, indent=2)
+                            })
                         )
                     ]
                 )
@@ -506,19 +888,19 @@ def create_server(config: FileMakerConfig = None) -> Server:
             elif name == "describe_table":
                 database = arguments["database"]
                 table = arguments["table"]
-                conn = get_connection(database)
-                columns = conn.get_columns(table)
+                async with get_pool(database).acquire() as conn:
+                    columns = await conn.run(conn.get_columns, table)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
+                            text=_dumps({
                                 "success": True,
                                 "database": database,
                                 "table": table,
                                 "columns": columns
-                            }, indent=2)
+                            })
                         )
                     ]
                 )
@@ -528,23 +910,51 @@ def create_server(config: FileMakerConfig = None) -> Server:
                 table = arguments["table"]
                 data = arguments["data"]
 
-                columns = ", ".join(data.keys())
-                placeholders = ", ".join(["?" for _ in data])
+                sql = insert_sql(database, table, tuple(data))
                 values = tuple(data.values())
 
-                sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+                async with get_pool(database).acquire() as conn:
+                    affected = await conn.run(conn.execute_update, sql, values)
 
-                conn = get_connection(database)
-                affected = conn.execute_update(sql, values)
+                return CallToolResult(
+                    content=[
+                        TextContent(
+                            type="text",
+                            text=_dumps({
+                                "success": True,
+                                "message": f"Inserted {affected} record(s)"
+                            })
+                        )
+                    ]
+                )
+
+            elif name == "insert_records":
+                database = arguments["database"]
+                table = arguments["table"]
+                records = arguments["data"]
+
+                if not records:
+                    raise ValueError("No records to insert")
+
+                columns = tuple(records[0])
+                for record in records:
+                    if record.keys() != records[0].keys():
+                        raise ValueError("All records must have the same columns")
+
+                sql = insert_sql(database, table, columns)
+                values = [tuple(record[c] for c in columns) for record in records]
+
+                async with get_pool(database).acquire() as conn:
+                    affected = await conn.run(conn.execute_update_many, sql, values)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
+                            text=_dumps({
                                 "success": True,
                                 "message": f"Inserted {affected} record(s)"
-                            }, indent=2)
+                            })
                         )
                     ]
                 )
@@ -555,44 +965,82 @@ def create_server(config: FileMakerConfig = None) -> Server:
                 data = arguments["data"]
                 where = arguments["where"]
 
-                set_clause = ", ".join([f"{k} = ?" for k in data.keys()])
+                sql = update_sql(database, table, tuple(data)) + where
                 values = tuple(data.values())
 
-                sql = f"UPDATE {table} SET {set_clause} WHERE {where}"
-
-                conn = get_connection(database)
-                affected = conn.execute_update(sql, values)
+                async with get_pool(database).acquire() as conn:
+                    affected = await conn.run(conn.execute_update, sql, values)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
+                            text=_dumps({
                                 "success": True,
                                 "message": f"Updated {affected} record(s)"
-                            }, indent=2)
+                            })
                         )
                     ]
                 )
 
             elif name == "list_all_databases":
-                all_db_info = {}
-                for db in FILEMAKER_DATABASES:
+                async def database_info(db: str) -> dict:
                     try:
-                        conn = get_connection(db)
-                        tables = conn.get_tables()
-                        all_db_info[db] = {"tables": tables, "count": len(tables)}
+                        async with get_pool(db).acquire() as conn:
+                            tables = await conn.run(conn.get_tables)
+                        return {"tables": tables, "count": len(tables)}
                     except Exception as e:
-                        all_db_info[db] = {"error": str(e)}
+                        return {"error": str(e)}
+
+                # Answer from the schema cache where possible, and only
+                # introspect the remaining databases (concurrently)
+                cached_info = {}
+                missing = []
+                for db in FILEMAKER_DATABASES:
+                    schema = schema_cache.get(db)
+                    if schema is None:
+                        missing.append(db)
+                    else:
+                        cached_info[db] = {"tables": list(schema), "count": len(schema)}
+
+                if missing:
+                    results = await asyncio.gather(*(database_info(db) for db in missing))
+                    cached_info.update(zip(missing, results))
+
+                all_db_info = {db: cached_info[db] for db in FILEMAKER_DATABASES}
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
+                            text=_dumps({
                                 "success": True,
                                 "databases": all_db_info
-                            }, indent=2)
+                            })
+                        )
+                    ]
+                )
+
+            elif name == "refresh_schema":
+                database = arguments.get("database")
+
+                if database:
+                    schema_cache.pop(database, None)
+                    schema_text_cache.pop(database, None)
+                    refreshed = [database]
+                else:
+                    refreshed = sorted(schema_cache)
+                    schema_cache.clear()
+                    schema_text_cache.clear()
+
+                return CallToolResult(
+                    content=[
+                        TextContent(
+                            type="text",
+                            text=_dumps({
+                                "success": True,
+                                "refreshed": refreshed
+                            })
                         )
                     ]
                 )
@@ -600,28 +1048,30 @@ def create_server(config: FileMakerConfig = None) -> Server:
             elif name == "search_patients":
                 search_term = arguments["search_term"]
                 field = arguments.get("field", "\"Last Name\"")
+                match_mode = arguments.get("match_mode", "prefix")
                 limit = arguments.get("limit", 50)
 
+                if match_mode not in SEARCH_PATTERNS:
+                    raise ValueError(f"Invalid match_mode: {match_mode}")
+                operator, pattern = SEARCH_PATTERNS[match_mode]
+                pattern = pattern.format(search_term)
+
                 # Select specific columns to avoid memory issues (table has 630 columns!)
                 sql = f"""SELECT "Patient ID#", "Last Name", "First Name", "Middle Initial",
                          "Street Address", "City", "State", "Zip",
                          "Home Phone", "Work Phone", "Birth Date",
                          "Social Security #", "Type of Insurance",
                          "Date Entered", "Exam Date", "Recall Date"
-                         FROM Patients WHERE {field} LIKE ?"""
+                         FROM Patients WHERE {field} {operator} ?"""
 
-                conn = get_connection("Patients")
-                results = conn.execute_query(sql, (f"%{search_term}%",), limit=limit)
+                async with get_pool("Patients").acquire() as conn:
+                    columns, rows = await conn.run(conn.execute_query, sql, (pattern,), limit=limit)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
-                                "success": True,
-                                "row_count": len(results),
-                                "data": results
-                            }, indent=2, default=str)
+                            text=_rows_json(columns, rows)
                         )
                     ]
                 )
@@ -630,14 +1080,16 @@ def create_server(config: FileMakerConfig = None) -> Server:
                 date = arguments["date"]
                 end_date = arguments.get("end_date")
                 patient_id = arguments.get("patient_id")
+                select_columns = arguments.get("columns") or APPOINTMENT_COLUMNS
                 limit = arguments.get("limit", 100)
 
                 # FileMaker field names have spaces: dateappt, timeappt, "patient id#"
+                sql = f"SELECT {_select_list(select_columns)} FROM Appointments"
                 if end_date:
-                    sql = "SELECT * FROM Appointments WHERE dateappt BETWEEN ? AND ?"
+                    sql += " WHERE dateappt BETWEEN ? AND ?"
                     params = (date, end_date)
                 else:
-                    sql = "SELECT * FROM Appointments WHERE dateappt = ?"
+                    sql += " WHERE dateappt = ?"
                     params = (date,)
 
                 if patient_id:
@@ -646,18 +1098,14 @@ def create_server(config: FileMakerConfig = None) -> Server:
 
                 sql += " ORDER BY timeappt"
 
-                conn = get_connection("Appointments")
-                results = conn.execute_query(sql, params, limit=limit)
+                async with get_pool("Appointments").acquire() as conn:
+                    columns, rows = await conn.run(conn.execute_query, sql, params, limit=limit)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
-                                "success": True,
-                                "row_count": len(results),
-                                "data": results
-                            }, indent=2, default=str)
+                            text=_rows_json(columns, rows)
                         )
                     ]
                 )
@@ -666,43 +1114,27 @@ def create_server(config: FileMakerConfig = None) -> Server:
                 patient_id = arguments.get("patient_id")
                 start_date = arguments.get("start_date")
                 end_date = arguments.get("end_date")
+                select_columns = arguments.get("columns")
                 limit = arguments.get("limit", 100)
 
-                conditions = []
-                params = []
-
-                # Actual field names from schema
-                if patient_id:
-                    conditions.append("\"Patient ID#\" = ?")
-                    params.append(patient_id)
-                if start_date:
-                    conditions.append("\"Transaction Date\" >= ?")
-                    params.append(start_date)
-                if end_date:
-                    conditions.append("\"Transaction Date\" <= ?")
-                    params.append(end_date)
+                filters = (patient_id, start_date, end_date)
+                key = (bool(patient_id), bool(start_date), bool(end_date))
+                params = tuple(itertools.compress(filters, key))
 
-                # Select key columns (table has 533 columns!)
-                sql = """SELECT "Patient ID#", "Last Name", "First Name",
-                        "Transaction Date", "Transaction #",
-                        "Exam Proc", "CL Fitting Proc", "Photos Proc",
-                        "Office Proc", "Solutions"
-                        FROM Transactions"""
-                if conditions:
-                    sql += " WHERE " + " AND ".join(conditions)
+                # Select key columns by default (table has 533 columns!)
+                if select_columns:
+                    sql = f"SELECT {_select_list(select_columns)} FROM Transactions" + TRANSACTION_WHERE[key]
+                else:
+                    sql = TRANSACTION_SQL[key]
 
-                conn = get_connection("Transactions")
-                results = conn.execute_query(sql, tuple(params) if params else None, limit=limit)
+                async with get_pool("Transactions").acquire() as conn:
+                    columns, rows = await conn.run(conn.execute_query, sql, params or None, limit=limit)
 
                 return CallToolResult(
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({
-                                "success": True,
-                                "row_count": len(results),
-                                "data": results
-                            }, indent=2, default=str)
+                            text=_rows_json(columns, rows)
                         )
                     ]
                 )
@@ -712,7 +1144,7 @@ def create_server(config: FileMakerConfig = None) -> Server:
                     content=[
                         TextContent(
                             type="text",
-                            text=json.dumps({"error": f"Unknown tool: {name}"})
+                            text=_dumps({"error": f"Unknown tool: {name}"})
                         )
                     ],
                     isError=True
@@ -724,10 +1156,10 @@ def create_server(config: FileMakerConfig = None) -> Server:
                 content=[
                     TextContent(
                         type="text",
-                        text=json.dumps({
+                        text=_dumps({
                             "success": False,
                             "error": str(e)
-                        }, indent=2)
+                        })
                     )
                 ],
                 isError=True
@@ -738,14 +1170,26 @@ def create_server(config: FileMakerConfig = None) -> Server:
 
 async def main():
     """Run the MCP server."""
-    server = create_server()
-
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    config = FileMakerConfig()
+    pools = {db: ConnectionPool(config, db) for db in FILEMAKER_DATABASES}
+    server = create_server(config, pools)
+
+    # Connect to all databases in the background so the ODBC handshake is
+    # paid at startup rather than by the first tool call
+    warm_up = None if LAZY_CONNECT else asyncio.create_task(warm_pools(pools))
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        # Don't leave pre-connecting running past shutdown
+        if warm_up is not None:
+            warm_up.cancel()
+            await asyncio.gather(warm_up, return_exceptions=True)
 
 
 if __name__ == "__main__":
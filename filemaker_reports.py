@@ -5,15 +5,32 @@ FileMaker to Google Sheets Report Generator
 Pulls reports from FileMaker databases and updates Google Sheets automatically.
 """
 
+import asyncio
+import functools
 import os
 import json
+import queue
+import threading
+import time
 import pyodbc
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import gspread
+from gspread.utils import absolute_range_name
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 env_path = Path(__file__).parent / ".env"
@@ -28,150 +45,356 @@ FM_DSN = os.environ.get("FILEMAKER_DSN", "Filemaker")
 FM_USER = os.environ.get("FILEMAKER_USER", "")
 FM_PASS = os.environ.get("FILEMAKER_PASS", "")
 
+# Maximum number of open connections kept per database
+FM_POOL_SIZE = int(os.environ.get("FILEMAKER_POOL_SIZE", "4"))
+
+# Rows fetched per fetchmany() call when streaming large result sets
+# (set as cursor.arraysize on cursors that return many rows; single-row
+# COUNT(*) cursors are left alone)
+FETCH_BATCH_SIZE = 2000
+
+# Failures a report run can hit that callers report rather than crash on:
+# database errors, Sheets API errors, expired Google credentials, and
+# network or file I/O (requests' exceptions are OSErrors)
+REPORT_ERRORS = (pyodbc.Error, gspread.exceptions.APIError, RefreshError, OSError)
+
+# Seconds a report query result is reused before FileMaker is asked again
+REPORT_CACHE_TTL = 60
+
+
+def _has_placeholders(report: dict) -> bool:
+    """Check whether a report holds a stand-in for a count that failed."""
+    return any(
+        isinstance(value, str) and (value == "N/A" or value.startswith("Error"))
+        for value in report.values()
+    )
+
+
+def ttl_cache(seconds: float, skip_if=None):
+    """Memoize a method on its positional arguments for `seconds`.
+
+    The instance is not part of the key: every FileMakerReports reads the
+    same DSN, so a result is shared by all of them (and by successive runs
+    in one process). Entries are keyed on the exact arguments, so callers
+    should resolve defaults (e.g. "today") before calling. Results for
+    which skip_if(result) is true are returned but not stored. The wrapper
+    exposes cache_clear().
+    """
+    def decorator(func):
+        cache = {}
+
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            now = time.monotonic()
+            hit = cache.get(args)
+            if hit is not None and now - hit[0] < seconds:
+                return hit[1]
+            result = func(self, *args)
+            # Drop expired entries so long-running callers don't accumulate them
+            for key in [key for key, (at, _) in cache.items() if now - at >= seconds]:
+                del cache[key]
+            if skip_if is None or not skip_if(result):
+                cache[args] = (now, result)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+class _Pool:
+    """Bounded, thread-safe pool of pyodbc connections to one database.
+
+    Connections are opened lazily up to maxsize; once that many are in use,
+    acquire() blocks until one is released or discarded. Idle connections
+    are checked before being handed out, and dead ones are replaced.
+    """
+
+    def __init__(self, conn_str: str, maxsize: int = FM_POOL_SIZE):
+        self.conn_str = conn_str
+        self.maxsize = maxsize
+        self._idle = queue.Queue(maxsize=maxsize)
+        # One permit per connection that may be open, held by each borrower
+        # until release() or discard(). A failed open gives its permit back
+        # too, so a waiting borrower always gets its turn.
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+    @staticmethod
+    def _is_alive(conn: pyodbc.Connection) -> bool:
+        """Check whether a connection is still usable."""
+        try:
+            conn.getinfo(pyodbc.SQL_DATABASE_NAME)
+            return True
+        except pyodbc.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: pyodbc.Connection):
+        """Close a connection that may already be broken."""
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+    def acquire(self) -> pyodbc.Connection:
+        """Take a live idle connection, opening a new one if none is idle."""
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return pyodbc.connect(self.conn_str)
+                if self._is_alive(conn):
+                    return conn
+                self._close_quietly(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: pyodbc.Connection):
+        """Return a connection to the pool."""
+        self._idle.put_nowait(conn)
+        self._slots.release()
+
+    def discard(self, conn: pyodbc.Connection):
+        """Close a borrowed connection instead of returning it, freeing its slot."""
+        self._close_quietly(conn)
+        self._slots.release()
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
 
 class FileMakerReports:
     """Generate reports from FileMaker databases."""
 
     def __init__(self):
-        self.connections = {}
-
-    def get_connection(self, database: str) -> pyodbc.Connection:
-        """Get or create a connection to a FileMaker database."""
-        if database not in self.connections:
-            conn_str = f"DSN={FM_DSN};UID={FM_USER};PWD={FM_PASS};ServerDataSource={database}"
-            self.connections[database] = pyodbc.connect(conn_str)
-        return self.connections[database]
+        self.pools = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self, database: str) -> _Pool:
+        """Get or create the connection pool for a FileMaker database."""
+        with self._lock:
+            if database not in self.pools:
+                conn_str = f"DSN={FM_DSN};UID={FM_USER};PWD={FM_PASS};ServerDataSource={database}"
+                self.pools[database] = _Pool(conn_str)
+            return self.pools[database]
+
+    @contextmanager
+    def connection(self, database: str):
+        """Borrow a pooled connection to a FileMaker database."""
+        pool = self.get_pool(database)
+        conn = pool.acquire()
+        try:
+            yield conn
+        except BaseException:
+            # The connection may be what failed; don't hand it out again
+            pool.discard(conn)
+            raise
+        pool.release(conn)
 
     def close_all(self):
-        """Close all database connections."""
-        for conn in self.connections.values():
-            conn.close()
-        self.connections = {}
-
-    def get_daily_appointments(self, date: str = None) -> dict:
-        """Get appointment statistics for a given date."""
+        """Close all pooled database connections."""
+        with self._lock:
+            pools, self.pools = self.pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def get_daily_appointments(self, date: str = None, now: datetime = None) -> dict:
+        """Get appointment statistics for a given date (default: the day of `now`)."""
         if date is None:
-            date = datetime.now().strftime("%Y-%m-%d")
-
-        conn = self.get_connection("Appointments")
-        cursor = conn.cursor()
-
-        # Get all appointments for the day and count in Python
-        # (FileMaker ODBC doesn't support GROUP BY well)
-        cursor.execute(
-            "SELECT doctor, examtype FROM Appointments WHERE dateappt = ?",
-            (date,)
-        )
-        rows = cursor.fetchall()
-
-        total = len(rows)
-
-        # Count by doctor
-        by_doctor = {}
-        for row in rows:
-            doc = row[0] or "Unassigned"
-            by_doctor[doc] = by_doctor.get(doc, 0) + 1
-
-        # Count by exam type
-        by_type = {}
-        for row in rows:
-            exam = row[1] or "Unspecified"
-            by_type[exam] = by_type.get(exam, 0) + 1
+            date = (now or datetime.now()).strftime("%Y-%m-%d")
+        return self._daily_appointments(date)
+
+    @ttl_cache(REPORT_CACHE_TTL)
+    def _daily_appointments(self, date: str) -> dict:
+        with self.connection("Appointments") as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = FETCH_BATCH_SIZE
+
+            # Let FileMaker count per (doctor, exam type) pair so only the
+            # aggregated rows cross the ODBC connection
+            try:
+                cursor.execute(
+                    "SELECT doctor, examtype, COUNT(*) FROM Appointments "
+                    "WHERE dateappt = ? GROUP BY doctor, examtype",
+                    (date,)
+                )
+                counts = cursor.fetchall()
+            except pyodbc.Error:
+                # FileMaker ODBC doesn't always handle GROUP BY well, so fall
+                # back to fetching every appointment and counting in Python
+                cursor.execute(
+                    "SELECT doctor, examtype FROM Appointments WHERE dateappt = ?",
+                    (date,)
+                )
+                # Stream rows in fetchmany() batches of FETCH_BATCH_SIZE
+                # rather than holding them all via fetchall()
+                counts = (
+                    (doc, exam, 1)
+                    for batch in iter(cursor.fetchmany, [])
+                    for doc, exam in batch
+                )
+
+            # Roll the pair counts up into per-doctor and per-exam-type totals
+            # (inside the with block, since the fallback is still reading)
+            by_doctor = Counter()
+            by_type = Counter()
+            for doc, exam, count in counts:
+                by_doctor[doc or "Unassigned"] += count
+                by_type[exam or "Unspecified"] += count
 
         return {
             "date": date,
-            "total_appointments": total,
-            "by_doctor": by_doctor,
-            "by_exam_type": by_type
+            "total_appointments": sum(by_doctor.values()),
+            "by_doctor": dict(by_doctor),
+            "by_exam_type": dict(by_type)
         }
 
     def get_appointment_range(self, start_date: str, end_date: str) -> list:
         """Get daily appointment counts for a date range."""
-        conn = self.get_connection("Appointments")
-        cursor = conn.cursor()
-
-        # FileMaker ODBC doesn't support GROUP BY, so count in Python
-        cursor.execute(
-            "SELECT dateappt FROM Appointments WHERE dateappt BETWEEN ? AND ?",
-            (start_date, end_date)
-        )
-
-        # Count by date
-        counts = {}
-        for row in cursor.fetchall():
-            date_str = str(row[0])
-            counts[date_str] = counts.get(date_str, 0) + 1
+        with self.connection("Appointments") as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = FETCH_BATCH_SIZE
+
+            # Count by date, in FileMaker if it accepts the GROUP BY
+            counts = Counter()
+            try:
+                cursor.execute(
+                    "SELECT dateappt, COUNT(*) FROM Appointments "
+                    "WHERE dateappt BETWEEN ? AND ? GROUP BY dateappt",
+                    (start_date, end_date)
+                )
+                for day, count in cursor.fetchall():
+                    counts[str(day)] += count
+            except pyodbc.Error:
+                # Otherwise count in Python, streaming the rows in batches
+                # rather than holding the whole range in memory
+                cursor.execute(
+                    "SELECT dateappt FROM Appointments WHERE dateappt BETWEEN ? AND ?",
+                    (start_date, end_date)
+                )
+                while batch := cursor.fetchmany():
+                    counts.update(str(row[0]) for row in batch)
 
         return [{"date": d, "count": c} for d, c in sorted(counts.items())]
 
-    def get_patient_stats(self) -> dict:
-        """Get patient statistics."""
-        conn = self.get_connection("Patients")
-        cursor = conn.cursor()
+    def get_patient_stats(self, now: datetime = None) -> dict:
+        """Get patient statistics for the month of `now` (default: this month)."""
+        month_start = (now or datetime.now()).replace(day=1)
+        end_of_month = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return self._patient_stats(month_start.strftime("%Y-%m-%d"), end_of_month.strftime("%Y-%m-%d"))
 
+    @ttl_cache(REPORT_CACHE_TTL, skip_if=_has_placeholders)
+    def _patient_stats(self, first_of_month: str, end_of_month: str) -> dict:
         # This is a simplified version - adjust based on actual data
-        stats = {}
-
-        # Count patients by getting a sample and counting
-        # (Full count may be too slow for large tables)
-        try:
-            cursor.execute('SELECT COUNT(*) FROM Patients WHERE "Patient ID#" IS NOT NULL')
-            stats["total_patients"] = cursor.fetchone()[0]
-        except:
-            stats["total_patients"] = "Error counting"
+        # Each stat: (key, count expression, parameters, value if it can't be counted)
+        counts = [
+            # All patients
+            ("total_patients", 'COUNT(*) FROM Patients WHERE "Patient ID#" IS NOT NULL',
+             (), "Error counting"),
+            # New patients this month
+            ("new_this_month", 'COUNT(*) FROM Patients WHERE "Date Entered" >= ?',
+             (first_of_month,), "N/A"),
+            # Recalls due this month
+            ("recalls_due", 'COUNT(*) FROM Patients WHERE "Recall Date" BETWEEN ? AND ?',
+             (first_of_month, end_of_month), "N/A"),
+        ]
 
-        # New patients this month
-        first_of_month = datetime.now().replace(day=1).strftime("%Y-%m-%d")
-        try:
-            cursor.execute(
-                'SELECT COUNT(*) FROM Patients WHERE "Date Entered" >= ?',
-                (first_of_month,)
-            )
-            stats["new_this_month"] = cursor.fetchone()[0]
-        except:
-            stats["new_this_month"] = "N/A"
-
-        # Recalls due this month
-        end_of_month = (datetime.now().replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        try:
-            cursor.execute(
-                'SELECT COUNT(*) FROM Patients WHERE "Recall Date" BETWEEN ? AND ?',
-                (first_of_month, end_of_month.strftime("%Y-%m-%d"))
-            )
-            stats["recalls_due"] = cursor.fetchone()[0]
-        except:
-            stats["recalls_due"] = "N/A"
+        with self.connection("Patients") as conn:
+            cursor = conn.cursor()
+
+            # Fetch all counts in one round-trip, each row tagged with its key
+            try:
+                cursor.execute(
+                    " UNION ALL ".join(f"SELECT '{key}', {expr}" for key, expr, _, _ in counts),
+                    tuple(param for _, _, params, _ in counts for param in params)
+                )
+                # FileMaker may pad the tag literals to a common width
+                results = {tag.strip(): count for tag, count in cursor.fetchall()}
+                return {key: results.get(key, fallback) for key, _, _, fallback in counts}
+            except pyodbc.Error:
+                pass
+
+            # Fall back to one query per count, so one failure doesn't lose the others
+            stats = {}
+            for key, expr, params, fallback in counts:
+                try:
+                    cursor.execute(f"SELECT {expr}", params)
+                    stats[key] = cursor.fetchone()[0]
+                except pyodbc.Error:
+                    stats[key] = fallback
 
         return stats
 
-    def get_transaction_summary(self, start_date: str = None, end_date: str = None) -> dict:
-        """Get transaction summary for a date range."""
+    def get_transaction_summary(
+        self, start_date: str = None, end_date: str = None, now: datetime = None
+    ) -> dict:
+        """Get transaction summary for a date range (default: month to date of `now`)."""
+        now = now or datetime.now()
         if start_date is None:
-            start_date = datetime.now().replace(day=1).strftime("%Y-%m-%d")
+            start_date = now.replace(day=1).strftime("%Y-%m-%d")
         if end_date is None:
-            end_date = datetime.now().strftime("%Y-%m-%d")
-
-        conn = self.get_connection("Transactions")
-        cursor = conn.cursor()
+            end_date = now.strftime("%Y-%m-%d")
+        return self._transaction_summary(start_date, end_date)
 
+    @ttl_cache(REPORT_CACHE_TTL, skip_if=_has_placeholders)
+    def _transaction_summary(self, start_date: str, end_date: str) -> dict:
         summary = {
             "start_date": start_date,
             "end_date": end_date,
         }
 
-        # Count transactions
-        try:
-            cursor.execute(
-                'SELECT COUNT(*) FROM Transactions WHERE "Transaction Date" BETWEEN ? AND ?',
-                (start_date, end_date)
-            )
-            summary["transaction_count"] = cursor.fetchone()[0]
-        except Exception as e:
-            summary["transaction_count"] = f"Error: {e}"
+        with self.connection("Transactions") as conn:
+            cursor = conn.cursor()
+
+            # Count transactions
+            try:
+                cursor.execute(
+                    'SELECT COUNT(*) FROM Transactions WHERE "Transaction Date" BETWEEN ? AND ?',
+                    (start_date, end_date)
+                )
+                summary["transaction_count"] = cursor.fetchone()[0]
+            except pyodbc.Error as e:
+                summary["transaction_count"] = f"Error: {e}"
 
         return summary
 
 
+@functools.lru_cache(maxsize=4)
+def _get_spreadsheet(credentials_file: str, sheet_id: str):
+    """Authorize with Google and open a spreadsheet, once per process.
+
+    Returns (client, spreadsheet). Call _get_spreadsheet.cache_clear() if
+    the credentials stop working so the next call re-authorizes.
+    """
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    creds = Credentials.from_service_account_file(
+        credentials_file,
+        scopes=scopes
+    )
+    # One keep-alive session for all Sheets API calls, retrying rate limits
+    # and transient server errors (idempotent requests only)
+    session = AuthorizedSession(creds)
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    ))
+    client = gspread.Client(auth=creds, session=session)
+    return client, client.open_by_key(sheet_id)
+
+
 class GoogleSheetsUpdater:
     """Update Google Sheets with report data."""
 
@@ -181,16 +404,7 @@ class GoogleSheetsUpdater:
         self.spreadsheet = None
 
         if credentials_file.exists():
-            scopes = [
-                "https://www.googleapis.com/auth/spreadsheets",
-                "https://www.googleapis.com/auth/drive"
-            ]
-            creds = Credentials.from_service_account_file(
-                str(credentials_file),
-                scopes=scopes
-            )
-            self.client = gspread.authorize(creds)
-            self.spreadsheet = self.client.open_by_key(sheet_id)
+            self.client, self.spreadsheet = _get_spreadsheet(str(credentials_file), sheet_id)
         else:
             print(f"Warning: Credentials file not found: {credentials_file}")
             print("Google Sheets updates will be skipped.")
@@ -205,7 +419,47 @@ class GoogleSheetsUpdater:
         except gspread.WorksheetNotFound:
             return self.spreadsheet.add_worksheet(title=title, rows=rows, cols=cols)
 
-    def update_daily_summary(self, report_data: dict):
+    @staticmethod
+    def find_date_rows(worksheet, date: str) -> tuple[list[str], list[int]]:
+        """Get column A and the (1-based) row numbers whose column A holds date.
+
+        Reads only column A, rather than searching or downloading the
+        whole sheet.
+        """
+        dates = worksheet.col_values(1)
+        return dates, [row for row, value in enumerate(dates, 1) if value == date]
+
+    @staticmethod
+    def row_runs(rows: list[int]) -> list[tuple[int, int]]:
+        """Group ascending row numbers into (first, last) runs of consecutive rows.
+
+        Rows for one date aren't guaranteed to be adjacent (e.g. after the
+        sheet is sorted), so each run is handled separately.
+        """
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1] = (runs[-1][0], row)
+            else:
+                runs.append((row, row))
+        return runs
+
+    @staticmethod
+    def append_rows(worksheet, rows: list[list]):
+        """Append rows after the last filled row in one values.append call."""
+        worksheet.append_rows(rows, value_input_option="RAW", insert_data_option="INSERT_ROWS")
+
+    def batch_update(self, worksheet, updates: list[tuple[str, list]]):
+        """Write several (range, values) pairs to a worksheet in one API call."""
+        self.spreadsheet.values_batch_update({
+            "valueInputOption": "RAW",
+            "data": [
+                {"range": absolute_range_name(worksheet.title, cell_range), "values": values}
+                for cell_range, values in updates
+            ]
+        })
+
+    def update_daily_summary(self, report_data: dict, now: datetime = None):
         """Update the daily summary sheet."""
         if not self.spreadsheet:
             print("Skipping Google Sheets update (no credentials)")
@@ -213,21 +467,16 @@ class GoogleSheetsUpdater:
 
         worksheet = self.get_or_create_worksheet("Daily Summary")
 
-        # Find or add today's row
-        today = datetime.now().strftime("%Y-%m-%d")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Find or add today's row, with both cells taken from the same instant
+        now = now or datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
 
         # Headers
         headers = ["Date", "Last Updated", "Total Appointments", "New Patients", "Recalls Due", "Transactions"]
-        worksheet.update("A1:F1", [headers])
 
-        # Find existing row for today or append
-        try:
-            cell = worksheet.find(today)
-            row_num = cell.row
-        except:
-            # Append new row
-            row_num = len(worksheet.get_all_values()) + 1
+        # Find existing row for today
+        dates, today_rows = self.find_date_rows(worksheet, today)
 
         # Update data
         row_data = [
@@ -239,24 +488,32 @@ class GoogleSheetsUpdater:
             report_data.get("transactions", {}).get("transaction_count", 0)
         ]
 
-        worksheet.update(f"A{row_num}:F{row_num}", [row_data])
-        print(f"Updated Daily Summary row {row_num}")
+        if today_rows:
+            # Overwrite today's row, writing headers and data together
+            row_num = today_rows[0]
+            self.batch_update(worksheet, [
+                ("A1:F1", [headers]),
+                (f"A{row_num}:F{row_num}", [row_data]),
+            ])
+            print(f"Updated Daily Summary row {row_num}")
+        else:
+            self.append_rows(worksheet, [row_data] if dates else [headers, row_data])
+            print("Added today's row to Daily Summary")
 
-    def update_appointments_detail(self, appointments_data: dict):
+    def update_appointments_detail(self, appointments_data: dict, now: datetime = None):
         """Update detailed appointments sheet."""
         if not self.spreadsheet:
             return
 
         worksheet = self.get_or_create_worksheet("Appointments Detail")
 
-        today = datetime.now().strftime("%Y-%m-%d")
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        now = now or datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        timestamp = now.strftime("%H:%M:%S")
 
         # Headers
         headers = ["Date", "Time Updated", "Doctor", "Exam Type", "Count"]
-        worksheet.update("A1:E1", [headers])
 
-        # Clear old data for today and add new
         rows = []
 
         # By doctor
@@ -267,61 +524,106 @@ class GoogleSheetsUpdater:
         for exam_type, count in appointments_data.get("by_exam_type", {}).items():
             rows.append([today, timestamp, "ALL", exam_type, count])
 
+        # Remove old data for today and add new. Deleting (not just clearing)
+        # the old rows keeps repeated runs from leaving blank rows behind
+        # that every later append would push down.
+        dates, today_rows = self.find_date_rows(worksheet, today)
+        for first, last in reversed(self.row_runs(today_rows)):
+            # Bottom up, so the row numbers of earlier runs stay valid
+            worksheet.delete_rows(first, last)
+
         if rows:
-            # Find starting row (after header)
-            start_row = 2
-            worksheet.update(f"A{start_row}:E{start_row + len(rows) - 1}", rows)
+            self.append_rows(worksheet, rows if dates else [headers] + rows)
             print(f"Updated Appointments Detail with {len(rows)} rows")
 
 
-def run_reports(update_sheets: bool = True):
-    """Run all reports and optionally update Google Sheets."""
+async def run_reports_async(
+    update_sheets: bool = True,
+    fm: FileMakerReports = None,
+    sheets: GoogleSheetsUpdater = None
+):
+    """Run all reports and optionally update Google Sheets.
+
+    The three report queries hit different databases and don't depend on
+    each other, so they run concurrently in worker threads (pyodbc releases
+    the GIL while waiting on the driver). Each thread borrows its own
+    connection from the FileMakerReports pools.
+
+    Pass fm and/or sheets to reuse them across runs; connections of a
+    caller-supplied fm are left open for the next run.
+    """
+    # One instant for the whole run, so every date and timestamp agrees
+    now = datetime.now()
+
     print("=" * 50)
-    print(f"FileMaker Reports - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"FileMaker Reports - {now.strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 50)
 
-    fm = FileMakerReports()
+    owns_fm = fm is None
+    if owns_fm:
+        fm = FileMakerReports()
 
     try:
         # Gather all report data
-        print("\nGathering appointment data...")
-        appointments = fm.get_daily_appointments()
-        print(f"  Total appointments today: {appointments['total_appointments']}")
-
-        print("\nGathering patient stats...")
-        patients = fm.get_patient_stats()
-        print(f"  Total patients: {patients.get('total_patients', 'N/A')}")
-        print(f"  New this month: {patients.get('new_this_month', 'N/A')}")
-
-        print("\nGathering transaction summary...")
-        transactions = fm.get_transaction_summary()
-        print(f"  Transactions this month: {transactions.get('transaction_count', 'N/A')}")
-
-        report_data = {
-            "appointments": appointments,
-            "patients": patients,
-            "transactions": transactions,
-            "generated_at": datetime.now().isoformat()
-        }
-
-        # Update Google Sheets
-        if update_sheets:
-            print("\nUpdating Google Sheets...")
+        print("\nGathering appointment, patient and transaction data...")
+        appointments, patients, transactions = await asyncio.gather(
+            asyncio.to_thread(fm.get_daily_appointments, now=now),
+            asyncio.to_thread(fm.get_patient_stats, now=now),
+            asyncio.to_thread(fm.get_transaction_summary, now=now),
+        )
+    finally:
+        if owns_fm:
+            fm.close_all()
+
+    print(f"  Total appointments today: {appointments['total_appointments']}")
+    print(f"  Total patients: {patients.get('total_patients', 'N/A')}")
+    print(f"  New this month: {patients.get('new_this_month', 'N/A')}")
+    print(f"  Transactions this month: {transactions.get('transaction_count', 'N/A')}")
+
+    report_data = {
+        "appointments": appointments,
+        "patients": patients,
+        "transactions": transactions,
+        "generated_at": now.isoformat()
+    }
+
+    # Update Google Sheets
+    if update_sheets:
+        print("\nUpdating Google Sheets...")
+        if sheets is None:
             sheets = GoogleSheetsUpdater(CREDENTIALS_FILE, GOOGLE_SHEET_ID)
-            sheets.update_daily_summary(report_data)
-            sheets.update_appointments_detail(appointments)
-            print("Google Sheets updated successfully!")
-
-        # Save local copy
-        report_file = Path(__file__).parent / "latest_report.json"
+        try:
+            sheets.update_daily_summary(report_data, now)
+            sheets.update_appointments_detail(appointments, now)
+        except RefreshError:
+            # Don't keep handing out a client whose token can't be renewed
+            _get_spreadsheet.cache_clear()
+            raise
+        print("Google Sheets updated successfully!")
+
+    # Save local copy
+    report_file = Path(__file__).parent / "latest_report.json"
+    if orjson is not None:
+        report_file.write_bytes(orjson.dumps(
+            report_data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ))
+    else:
         with open(report_file, "w") as f:
             json.dump(report_data, f, indent=2, default=str)
-        print(f"\nLocal report saved to: {report_file}")
+    print(f"\nLocal report saved to: {report_file}")
 
-        return report_data
+    return report_data
 
-    finally:
-        fm.close_all()
+
+def run_reports(
+    update_sheets: bool = True,
+    fm: FileMakerReports = None,
+    sheets: GoogleSheetsUpdater = None
+):
+    """Run all reports and optionally update Google Sheets."""
+    return asyncio.run(run_reports_async(update_sheets=update_sheets, fm=fm, sheets=sheets))
 
 
 if __name__ == "__main__":
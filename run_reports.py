@@ -7,6 +7,9 @@ This script:
 2. Opens FileMaker with Open.fp7 if not
 3. Waits for ODBC to become available
 4. Runs the reports and updates Google Sheets
+
+With --daemon it keeps running, repeating step 4 every --interval=SECONDS
+(default 300) while reusing the ODBC connections and Google Sheets client.
 """
 
 import subprocess
@@ -17,6 +20,11 @@ import pyodbc
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 # Paths - adjust these if needed
 FILEMAKER_EXE = r"C:\Program Files (x86)\FileMaker\FileMaker Pro 9\FileMaker Pro.exe"
 OPEN_DATABASE = r"C:\Users\CL ROOM OP\OneDrive - Professional Eyecare\Desktop\test\Open.fp7"
@@ -24,22 +32,56 @@ OPEN_DATABASE = r"C:\Users\CL ROOM OP\OneDrive - Professional Eyecare\Desktop\te
 # Add project to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+# How long a successful ODBC check is trusted before probing again (seconds)
+ODBC_CHECK_TTL = 5
+
+# Login timeout for the ODBC availability probe (seconds)
+ODBC_PROBE_TIMEOUT = 2
+
+# Longest pause between ODBC checks while waiting for FileMaker (seconds)
+MAX_POLL_INTERVAL = 30
+
+# time.monotonic() of the last successful ODBC check
+_odbc_ready_at = None
+
+# Seconds between report runs in --daemon mode
+DAEMON_INTERVAL = 300
+
+# Longest pause between daemon runs while Google credentials keep failing
+MAX_AUTH_BACKOFF = 3600
+
 
 def is_filemaker_running() -> bool:
     """Check if FileMaker Pro is running."""
+    process_name = Path(FILEMAKER_EXE).name
+
+    if psutil is not None:
+        # Reads the process table directly and stops at the first match
+        return any(p.info["name"] == process_name for p in psutil.process_iter(["name"]))
+
     try:
         output = subprocess.check_output(
-            'tasklist /FI "IMAGENAME eq FileMaker Pro.exe"',
-            shell=True,
+            ["tasklist", "/FI", f"IMAGENAME eq {process_name}"],
             text=True
         )
-        return "FileMaker Pro.exe" in output
-    except:
+        return process_name in output
+    except (OSError, subprocess.SubprocessError):
         return False
 
 
 def is_odbc_available() -> bool:
-    """Check if ODBC connection is available."""
+    """Check if ODBC connection is available.
+
+    Connects to the DSN only, without a ServerDataSource, so the check
+    answers as soon as FileMaker's ODBC listener is up instead of waiting
+    for a database file to open. A successful check is remembered for
+    ODBC_CHECK_TTL seconds, so back-to-back callers don't each open a new
+    connection.
+    """
+    global _odbc_ready_at
+    if _odbc_ready_at is not None and time.monotonic() - _odbc_ready_at < ODBC_CHECK_TTL:
+        return True
+
     from dotenv import load_dotenv
     load_dotenv(Path(__file__).parent / ".env")
 
@@ -48,13 +90,12 @@ def is_odbc_available() -> bool:
     pwd = os.environ.get("FILEMAKER_PASS", "")
 
     try:
-        conn = pyodbc.connect(
-            f"DSN={dsn};UID={user};PWD={pwd};ServerDataSource=Patients",
-            timeout=5
-        )
+        # timeout= sets SQL_ATTR_LOGIN_TIMEOUT before the driver connects
+        conn = pyodbc.connect(f"DSN={dsn};UID={user};PWD={pwd}", timeout=ODBC_PROBE_TIMEOUT)
         conn.close()
+        _odbc_ready_at = time.monotonic()
         return True
-    except:
+    except pyodbc.Error:
         return False
 
 
@@ -82,6 +123,7 @@ def wait_for_odbc(max_wait: int = 120) -> bool:
     print("Waiting for ODBC connection...")
 
     start_time = time.time()
+    attempt = 0
     while time.time() - start_time < max_wait:
         if is_odbc_available():
             print("ODBC connection ready!")
@@ -89,20 +131,86 @@ def wait_for_odbc(max_wait: int = 120) -> bool:
 
         elapsed = int(time.time() - start_time)
         print(f"  Waiting... ({elapsed}s)", end="\r")
-        time.sleep(5)
+
+        # Back off exponentially: 1s, 2s, 4s, ... up to MAX_POLL_INTERVAL
+        time.sleep(min(MAX_POLL_INTERVAL, 2 ** attempt))
+        attempt += 1
 
     print(f"\nTimeout after {max_wait} seconds")
     return False
 
 
+def run_daemon(interval: int = DAEMON_INTERVAL):
+    """Run the reports every interval seconds until interrupted.
+
+    The FileMaker connection pools and the Google Sheets client are built
+    once and reused, so only the first run pays for connecting.
+    """
+    import gspread
+    from google.auth.exceptions import RefreshError
+    from filemaker_reports import (
+        CREDENTIALS_FILE, GOOGLE_SHEET_ID, FileMakerReports, GoogleSheetsUpdater, run_reports
+    )
+
+    fm = FileMakerReports()
+    sheets = None
+    auth_failures = 0
+    print(f"Daemon mode: running reports every {interval} seconds (Ctrl+C to stop)")
+
+    try:
+        while True:
+            try:
+                if sheets is None:
+                    sheets = GoogleSheetsUpdater(CREDENTIALS_FILE, GOOGLE_SHEET_ID)
+                run_reports(update_sheets=True, fm=fm, sheets=sheets)
+                auth_failures = 0
+            except RefreshError as e:
+                # The cached Sheets client has already been dropped; authorize
+                # again next run, waiting longer each time it keeps failing
+                print(f"\nERROR refreshing Google credentials: {e}")
+                sheets = None
+                auth_failures += 1
+            except pyodbc.Error as e:
+                # Connections may have gone stale (e.g. FileMaker restarted);
+                # start the next run with fresh ones
+                print(f"\nERROR running reports: {e}")
+                try:
+                    fm.close_all()
+                except pyodbc.Error:
+                    pass
+                fm = FileMakerReports()
+            except (gspread.exceptions.APIError, OSError) as e:
+                # Sheets quota or network trouble - try again next tick
+                print(f"\nERROR running reports: {e}")
+            time.sleep(max(interval, min(interval * 2 ** auth_failures, MAX_AUTH_BACKOFF)))
+    finally:
+        fm.close_all()
+
+
+def parse_interval(argv: list[str]) -> int:
+    """Get the --interval=SECONDS value, exiting with usage if it isn't a positive integer."""
+    value = next((arg.split("=", 1)[1] for arg in argv if arg.startswith("--interval=")), None)
+    if value is None:
+        return DAEMON_INTERVAL
+    if not value.isdigit() or int(value) == 0:
+        print(f"Invalid --interval value: {value!r}")
+        print("Usage: run_reports.py [--daemon [--interval=SECONDS]]")
+        sys.exit(2)
+    return int(value)
+
+
 def main():
+    daemon = "--daemon" in sys.argv
+    interval = parse_interval(sys.argv)
+
     print("=" * 60)
     print(f"FileMaker Report Auto-Launcher")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
 
     # Check if FileMaker is already running
-    if is_filemaker_running():
+    already_running = is_filemaker_running()
+    if already_running:
         print("FileMaker Pro is already running.")
     else:
         print("FileMaker Pro is not running.")
@@ -110,32 +218,41 @@ def main():
             print("Failed to start FileMaker Pro.")
             sys.exit(1)
 
-    # Wait for ODBC to be available
-    # Give FileMaker time to load databases
-    print("\nWaiting 10 seconds for FileMaker to initialize...")
-    time.sleep(10)
-
-    if not wait_for_odbc():
-        print("\nERROR: Could not connect to FileMaker via ODBC.")
-        print("Please check:")
-        print("  1. FileMaker is running with databases open")
-        print("  2. ODBC sharing is enabled in each database")
-        print("  3. Credentials in .env are correct")
-        sys.exit(1)
+    # If FileMaker was already up, ODBC is usually ready too - check once
+    # before paying for the startup wait
+    if already_running and is_odbc_available():
+        print("ODBC connection ready!")
+    else:
+        # Wait for ODBC to be available
+        # Give FileMaker time to load databases
+        print("\nWaiting 10 seconds for FileMaker to initialize...")
+        time.sleep(10)
+
+        if not wait_for_odbc():
+            print("\nERROR: Could not connect to FileMaker via ODBC.")
+            print("Please check:")
+            print("  1. FileMaker is running with databases open")
+            print("  2. ODBC sharing is enabled in each database")
+            print("  3. Credentials in .env are correct")
+            sys.exit(1)
 
     # Run the reports
     print("\n" + "=" * 60)
     print("Running reports...")
     print("=" * 60 + "\n")
 
-    from filemaker_reports import run_reports
+    if daemon:
+        run_daemon(interval)
+        return
+
+    from filemaker_reports import REPORT_ERRORS, run_reports
 
     try:
         report_data = run_reports(update_sheets=True)
         print("\n" + "=" * 60)
         print("Reports completed successfully!")
         print("=" * 60)
-    except Exception as e:
+    except REPORT_ERRORS as e:
         print(f"\nERROR running reports: {e}")
         sys.exit(1)
 
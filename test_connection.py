@@ -3,6 +3,7 @@
 
 import pyodbc
 import getpass
+from itertools import islice
 
 def test_connection():
     print("FileMaker ODBC Connection Test")
@@ -25,8 +26,10 @@ def test_connection():
         # List tables
         print("Available tables:")
         print("-" * 40)
-        tables = [t.table_name for t in cursor.tables() if t.table_type == "TABLE"]
-        for table in tables[:20]:  # Show first 20
+        # Let the driver filter to user tables rather than returning the
+        # whole catalog
+        tables = [t.table_name for t in cursor.tables(tableType="TABLE")]
+        for table in islice(tables, 20):  # Show first 20
             print(f"  - {table}")
 
         if len(tables) > 20: